@@ -1,9 +1,53 @@
 from __future__ import annotations
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import hmac
+import logging
+import os
+import threading
+from typing import Optional
+from fastapi import FastAPI, Header, HTTPException
 from pydantic import BaseModel
-from .pipeline import answer_question
+from .config import RAGConfig
+from .pipeline import IndexReloadError, answer_question, reload_index, serving_index_dir
+from .vector_store import current_index_version
 
-app = FastAPI(title="SEC RAG API", version="1.0")
+logger = logging.getLogger(__name__)
+
+def _watch_index(stop: threading.Event, interval: float, max_retries: int) -> None:
+    # Picks up a re-ingest (CURRENT flip) without a restart; the swap itself is cheap
+    # because only the FaissStore and fact table are reloaded, never the models.
+    failed_version: Optional[str] = None
+    failures = 0
+    while not stop.wait(interval):
+        if failures >= max_retries and current_index_version(serving_index_dir()) == failed_version:
+            continue  # gave up on this version; wait for the next flip instead of re-reading it every poll
+        try:
+            reload_index()
+        except IndexReloadError as e:
+            # A half-copied or broken version must not take down serving; keep the old one.
+            # Count failures against the version reload_index actually tried, not a separate CURRENT read.
+            failures = failures + 1 if e.version == failed_version else 1
+            failed_version = e.version
+            logger.exception("Index reload failed for version %s (attempt %d/%d)", e.version, failures, max_retries)
+            if failures >= max_retries:
+                logger.error("Skipping index version %s until CURRENT changes", e.version)
+        else:
+            failed_version, failures = None, 0
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stop = threading.Event()
+    config = RAGConfig()
+    if config.index_poll_seconds > 0:
+        threading.Thread(
+            target=_watch_index,
+            args=(stop, config.index_poll_seconds, config.index_reload_retries),
+            daemon=True,
+        ).start()
+    yield
+    stop.set()
+
+app = FastAPI(title="SEC RAG API", version="1.0", lifespan=lifespan)
 
 class QueryIn(BaseModel):
     query: str
@@ -11,3 +55,19 @@ class QueryIn(BaseModel):
 @app.post("/answer")
 def answer(q: QueryIn):
     return answer_question(q.query)
+
+@app.post("/admin/reload")
+def admin_reload(x_admin_token: Optional[str] = Header(default=None)):
+    # Disabled unless RAG_ADMIN_TOKEN is set; callers must send it as X-Admin-Token.
+    token = os.environ.get("RAG_ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        result = reload_index(blocking=False)
+    except IndexReloadError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load index version {e.version}") from e
+    if result is None:
+        raise HTTPException(status_code=409, detail="Reload already in progress")
+    return result
@@ -8,6 +8,11 @@ class RAGConfig(BaseModel):
     chunk_overlap: int = 120
     min_chunk_chars: int = 200
 
+    # Index versioning / hot-swap
+    index_keep_versions: int = 3    # versions kept on disk after ingest flips CURRENT
+    index_poll_seconds: float = 10.0  # API watcher interval for CURRENT flips; 0 disables
+    index_reload_retries: int = 3     # failed loads of one version before the watcher skips it until CURRENT changes
+
     # Embeddings
     embed_model: str = "BAAI/bge-small-en-v1.5"   # good default speed/quality
     embed_batch_size: int = 64
@@ -28,6 +33,9 @@ class RAGConfig(BaseModel):
     llm_temperature: float = 0.0
     llm_top_p: float = 1.0
 
+    # Fact table (answers direct lookups without the LLM; falls back to RAG otherwise)
+    fact_lookup: bool = True
+
     # Guardrails
     rerank_min_score: float = 0.15  # tune per reranker; low threshold to avoid false negatives
     evidence_must_match: bool = True
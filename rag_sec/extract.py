@@ -2,7 +2,7 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator, Optional, List, Dict
+from typing import Iterator, Optional, List, Dict, Tuple
 import fitz  # PyMuPDF
 from .utils import clean_text
 
@@ -11,6 +11,8 @@ ITEM_RE = re.compile(r"(?im)^\s*item\s+(\d{1,2}[a-z]?)\.?\s*(.*)$")
 # "Apple Inc. | 2024 Form 10-K | 56"
 # "Tesla, Inc. | 2023 Form 10-K | 4"
 FOOTER_PAGE_RE = re.compile(r"\|\s*(\d{1,4})\s*$")
+# Words whose vertical midpoints are within this many points belong to the same visual row.
+ROW_Y_TOLERANCE = 3.0
 
 @dataclass(frozen=True)
 class PageDoc:
@@ -83,3 +85,25 @@ def iter_pdf_pages(pdf_path: Path) -> Iterator[PageDoc]:
             item_title=current_title,
             text=txt,
         )
+
+def _page_rows(page) -> List[str]:
+    # get_text("text") emits table cells one per line; rebuild visual rows from word boxes
+    # so "Total net sales $ 391,035 $ 383,285" stays together with its label.
+    words = page.get_text("words") or []  # (x0, y0, x1, y1, word, block_no, line_no, word_no)
+    words = sorted(words, key=lambda w: ((w[1] + w[3]) / 2, w[0]))
+    rows: List[Tuple[float, List[Tuple[float, str]]]] = []
+    for x0, y0, _x1, y1, word, *_ in words:
+        mid = (y0 + y1) / 2
+        if rows and abs(rows[-1][0] - mid) <= ROW_Y_TOLERANCE:
+            rows[-1][1].append((x0, word))
+        else:
+            rows.append((mid, [(x0, word)]))
+    return [" ".join(w for _, w in sorted(cells)) for _, cells in rows]
+
+def iter_pdf_page_rows(pdf_path: Path) -> Iterator[Tuple[int, List[str]]]:
+    """Yields (page_pdf, rows) with rows rebuilt left-to-right from word positions; page_pdf is 1-indexed."""
+    doc = fitz.open(str(pdf_path))
+    for i in range(doc.page_count):
+        rows = _page_rows(doc.load_page(i))
+        if rows:
+            yield i + 1, rows
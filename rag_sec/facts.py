@@ -0,0 +1,331 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import orjson
+
+from .extract import PageDoc, iter_pdf_page_rows
+from .vector_store import resolve_index_dir
+
+FACTS_FILE = "facts.jsonl"
+
+_MONTHS = "January|February|March|April|May|June|July|August|September|October|November|December"
+DATE_RE = re.compile(rf"(?:{_MONTHS})\s+\d{{1,2}},\s+\d{{4}}")
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+PERIOD_RE = re.compile(rf"(?:{_MONTHS})\s+\d{{1,2}},\s+\d{{4}}|\b(?:19|20)\d{{2}}\b")
+YEAR_RANGE_RE = re.compile(r"\b(?:19|20)\d{2}\s*[–-]\s*(?:19|20)\d{2}\b")
+
+# Statement pages carry a scale note, e.g. "(In millions, except ...)" / "(in millions, except per share data)".
+SCALE_RE = re.compile(r"(?i)\bin (millions|thousands|billions)\b")
+# Apple: "(In millions, except number of shares, which are reflected in thousands, ...)"
+SHARE_SCALE_RE = re.compile(r"(?i)shares[^)]*?in (millions|thousands|billions)\b")
+CELL_RE = re.compile(r"^\(?-?\$?\d[\d,]*(?:\.\d+)?\)?$|^[—–-]$")
+
+# Cover page / signatures
+SHARES_OUT_RES = [
+    # Apple: "15,115,823,000 shares of common stock were issued and outstanding as of October 18, 2024."
+    re.compile(rf"(?P<value>\d[\d,]{{4,}}) shares of (?:the registrant[’']s )?common stock were issued and outstanding as of (?P<date>(?:{_MONTHS}) \d{{1,2}}, \d{{4}})"),
+    # Tesla: "As of January 29, 2024, there were 3,185,000,000 shares of the registrant's common stock outstanding."
+    re.compile(rf"As of (?P<date>(?:{_MONTHS}) \d{{1,2}}, \d{{4}}), there were (?P<value>\d[\d,]{{4,}}) shares of the registrant[’']s common stock outstanding"),
+]
+SIGNATURES_RE = re.compile(r"(?i)pursuant to the requirements of section 13 or 15\(d\)")
+SIGNED_DATE_RE = re.compile(rf"Date:\s*(?P<date>(?:{_MONTHS}) \d{{1,2}}, \d{{4}})")
+
+@dataclass(frozen=True)
+class _QueryMetric:
+    phrase: re.Pattern                  # removed from the question once matched
+    metrics: Tuple[str, ...]            # fact metrics that answer it
+    extra_words: frozenset = frozenset()  # further words this kind of question may use
+    requires: Optional[re.Pattern] = None
+
+# Query side: only direct lookups belong here. A question is answered from the table only if,
+# after removing the metric phrase, company, dates/years and filler words, nothing is left;
+# any unrecognised word ("Greater China", "per share", "Q4", "higher than") means the question
+# asks for something more specific or derived, and it goes to the full pipeline.
+QUERY_METRICS: List[_QueryMetric] = [
+    _QueryMetric(re.compile(r"\btotal (?:net )?(?:revenues?|sales)\b"), ("total net sales", "total revenues")),
+    _QueryMetric(re.compile(r"\bnet income\b"), ("net income",)),
+    _QueryMetric(re.compile(r"\btotal assets\b"), ("total assets",)),
+    _QueryMetric(re.compile(r"\btotal liabilities\b"), ("total liabilities",)),
+    _QueryMetric(re.compile(r"\b(?:total )?term debt\b"), ("total term debt",)),
+    _QueryMetric(
+        re.compile(r"\bshares\b"),
+        ("shares outstanding",),
+        extra_words=frozenset({"common", "stock", "issued", "and", "outstanding", "there", "registrant"}),
+        requires=re.compile(r"\boutstanding\b"),
+    ),
+    # "When / on what date was it signed"; "who signed" leaves "who" over and falls back.
+    _QueryMetric(
+        re.compile(r"\bsigned\b"),
+        ("signing date",),
+        extra_words=frozenset({"when", "date", "and", "filed", "with", "sec"}),
+        requires=re.compile(r"\b(?:when|date)\b"),
+    ),
+]
+FILLER_WORDS = frozenset({
+    "what", "was", "were", "is", "are", "the", "a", "an", "of", "for", "in", "on", "as", "at", "by",
+    "did", "does", "do", "has", "had", "have", "how", "many", "much", "its", "amount", "reported",
+    "report", "fiscal", "calendar", "year", "ended", "ending", "end", "annual", "filing", "form",
+    "10", "k", "inc",
+})
+COMPANY_RE = re.compile(r"\b(?:apple|tesla|tsla)(?:['’]?s)?\b")
+# Split on whitespace and plain punctuation only, so "%", "+", "/" etc. survive as unknown tokens.
+_QUERY_TOKEN_RE = re.compile(r"[^\s\-'’?!.,:;\"()]+")
+
+# Facts that describe the filing itself rather than a fiscal period.
+DOC_LEVEL_METRICS = {"signing date"}
+
+@dataclass(frozen=True)
+class Fact:
+    metric: str                 # normalized label, e.g. "total net sales"
+    label: str                  # label as printed
+    period: str                 # column header ("September 28, 2024", "2023") or as-of date; "" for filing-level facts
+    value: Optional[float]
+    value_text: str             # as printed, e.g. "391,035", "(1,234)", "November 1, 2024"
+    unit: str                   # "USD millions", "USD", "shares thousands", "shares", "date"
+    company: str
+    doc_name: str
+    item: str
+    page_pdf: int
+    page_report: Optional[int]
+
+def normalize_metric(label: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", label.lower()).strip()
+
+def _parse_number(tok: str) -> Optional[float]:
+    if tok in ("—", "–", "-"):
+        return 0.0
+    neg = tok.startswith("(") and tok.endswith(")")
+    digits = tok.strip("()").replace("$", "").replace(",", "")
+    try:
+        v = float(digits)
+    except ValueError:
+        return None
+    return -v if neg else v
+
+def _header_periods(row: str) -> Optional[List[str]]:
+    # "2013 – 2023 debt issuances:" is a row group heading inside a table, not column headers.
+    if row.rstrip().endswith(":") or YEAR_RANGE_RE.search(row):
+        return None
+    periods = PERIOD_RE.findall(row)
+    rest = PERIOD_RE.sub(" ", row)
+    if len(periods) >= 2 and not re.search(r"\d", rest) and len(rest.split()) <= 6:
+        return periods
+    return None
+
+def _split_row(row: str) -> Tuple[str, List[str]]:
+    # Walk from the right collecting numeric cells; whatever remains is the line-item label.
+    toks = row.split()
+    cells: List[str] = []
+    i = len(toks)
+    while i > 0:
+        tok = toks[i - 1]
+        if tok == "$":
+            i -= 1
+            continue
+        if not CELL_RE.match(tok):
+            break
+        cells.insert(0, tok.replace("$", ""))
+        i -= 1
+    label = " ".join(toks[:i]).rstrip(" $")
+    if cells:
+        label = label.rstrip(":")
+    return label, cells
+
+def _unit_for(label: str, scale: str, share_scale: str) -> str:
+    metric = normalize_metric(label)
+    if "per share" in metric and not metric.startswith("shares"):
+        return "USD"
+    if "shares" in metric:
+        return f"shares {share_scale}"
+    return f"USD {scale}"
+
+def _table_facts(page: PageDoc, rows: List[str]) -> Iterable[Fact]:
+    text = "\n".join(rows)
+    m = SCALE_RE.search(text)
+    if not m:
+        return  # not a financial statement / table page
+    scale = m.group(1).lower()
+    sm = SHARE_SCALE_RE.search(text)
+    share_scale = sm.group(1).lower() if sm else scale
+
+    periods: Optional[List[str]] = None
+    section: Optional[str] = None  # e.g. "Current liabilities" for the rows indented under it
+    for row in rows:
+        header = _header_periods(row)
+        if header:
+            periods, section = header, None
+            continue
+        if periods is None:
+            continue
+        label, cells = _split_row(row)
+        if not cells:
+            if label.endswith(":"):
+                section = label.rstrip(":")
+            continue
+        # Only keep rows that line up exactly with the column headers; anything else is ambiguous.
+        if len(cells) != len(periods):
+            continue
+        if not re.search(r"[A-Za-z]", label) or len(label.split()) > 12:
+            continue
+        if label.lower().startswith("total"):
+            section = None
+        elif section:
+            label = f"{section}: {label}"
+        unit = _unit_for(label, scale, share_scale)
+        for period, cell in zip(periods, cells):
+            yield Fact(
+                metric=normalize_metric(label),
+                label=label,
+                period=period,
+                value=_parse_number(cell),
+                value_text=cell,
+                unit=unit,
+                company=page.company,
+                doc_name=page.doc_name,
+                item=page.item or "Unknown",
+                page_pdf=page.page_pdf,
+                page_report=page.page_report,
+            )
+
+def _cover_facts(page: PageDoc) -> Iterable[Fact]:
+    flat = " ".join(page.text.split())
+    common = dict(
+        company=page.company,
+        doc_name=page.doc_name,
+        item=page.item or "Cover Page",
+        page_pdf=page.page_pdf,
+        page_report=page.page_report,
+    )
+    for rx in SHARES_OUT_RES:
+        m = rx.search(flat)
+        if m:
+            yield Fact(
+                metric="shares outstanding",
+                label="Shares of common stock outstanding",
+                period=m.group("date"),
+                value=_parse_number(m.group("value")),
+                value_text=m.group("value"),
+                unit="shares",
+                **common,
+            )
+    if SIGNATURES_RE.search(flat):
+        m = SIGNED_DATE_RE.search(flat)
+        if m:
+            yield Fact(
+                metric="signing date",
+                label="Signing date",
+                period="",
+                value=None,
+                value_text=m.group("date"),
+                unit="date",
+                **common,
+            )
+
+def format_fact_answer(fact: Fact) -> str:
+    unit, _, scale = fact.unit.partition(" ")
+    scale = scale[:-1] if scale.endswith("s") else scale  # "millions" -> "million"
+    if unit == "USD":
+        val = f"${fact.value_text} {scale}" if scale else f"${fact.value_text}"
+    elif unit == "shares":
+        val = f"{fact.value_text} {scale} shares" if scale else f"{fact.value_text} shares"
+    else:
+        val = fact.value_text
+    return f"{fact.label} ({fact.period}): {val}" if fact.period else f"{fact.label}: {val}"
+
+def _query_company(q: str) -> Optional[str]:
+    is_apple = "apple" in q
+    is_tesla = "tesla" in q or "tsla" in q
+    if is_apple == is_tesla:
+        return None
+    return "Apple" if is_apple else "Tesla"
+
+def _match_metric(query: str) -> Optional[_QueryMetric]:
+    """Returns the lookup the whole question is about, or None if any part of it is unaccounted for."""
+    q = PERIOD_RE.sub(" ", query).lower()
+    q = COMPANY_RE.sub(" ", q)
+    matched = [qm for qm in QUERY_METRICS if qm.phrase.search(q) and (qm.requires is None or qm.requires.search(q))]
+    if len(matched) != 1:
+        return None
+    qm = matched[0]
+    leftover = [w for w in _QUERY_TOKEN_RE.findall(qm.phrase.sub(" ", q)) if w not in FILLER_WORDS and w not in qm.extra_words]
+    return None if leftover else qm
+
+def _period_years(period: str) -> List[str]:
+    return YEAR_RE.findall(period)
+
+@dataclass
+class FactTable:
+    facts: List[Fact] = field(default_factory=list)
+    version: Optional[str] = None
+
+    def __post_init__(self):
+        self.by_metric: Dict[str, List[Fact]] = {}
+        for f in self.facts:
+            self.by_metric.setdefault(f.metric, []).append(f)
+
+    @classmethod
+    def build(cls, pages: List[PageDoc]) -> "FactTable":
+        facts: List[Fact] = []
+        by_page = {(p.pdf_path, p.page_pdf): p for p in pages}
+        for pdf_path in sorted({p.pdf_path for p in pages}):
+            for page_pdf, rows in iter_pdf_page_rows(Path(pdf_path)):
+                page = by_page.get((pdf_path, page_pdf))
+                if page is None:
+                    continue
+                facts.extend(_cover_facts(page))
+                facts.extend(_table_facts(page, rows))
+        return cls(facts=facts)
+
+    def lookup(self, query: str) -> Optional[Fact]:
+        """Returns the fact answering a direct lookup question, or None if not a confident match."""
+        q = query.lower()
+        qm = _match_metric(query)
+        if qm is None:
+            return None
+        metrics = qm.metrics
+        cands = [f for m in metrics for f in self.by_metric.get(m, [])]
+
+        company = _query_company(q)
+        if company:
+            cands = [f for f in cands if f.company == company]
+
+        doc_level = any(m in DOC_LEVEL_METRICS for m in metrics)
+        exact = [f for f in cands if f.period in DATE_RE.findall(query)] if not doc_level else []
+        if exact:
+            cands = exact
+        if len({f.company for f in cands}) > 1:
+            # No company named and no exact date pinning one filing: narrowing by year would
+            # silently pick one of them, so leave it to the full pipeline.
+            return None
+        if not doc_level and not exact:
+            years = YEAR_RE.findall(query)
+            if years:
+                cands = [f for f in cands if set(_period_years(f.period)) & set(years)]
+            elif cands:
+                latest = max(max(map(int, _period_years(f.period)), default=0) for f in cands)
+                cands = [f for f in cands if str(latest) in _period_years(f.period)]
+
+        # Same number printed on several pages is fine; conflicting values or companies are not.
+        if not cands or len({(f.company, f.value_text) for f in cands}) != 1:
+            return None
+        return cands[0]
+
+    def save(self, out_dir: Path) -> None:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        (out_dir / FACTS_FILE).write_bytes(b"\n".join(orjson.dumps(asdict(f)) for f in self.facts))
+
+    @classmethod
+    def load(cls, out_dir: Path, version: Optional[str] = None) -> "FactTable":
+        if version is None:
+            out_dir, version = resolve_index_dir(out_dir)
+        path = out_dir / FACTS_FILE
+        facts: List[Fact] = []
+        if path.exists():  # indexes built before the fact table simply have no lookups
+            with path.open("rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    facts.append(Fact(**orjson.loads(line)))
+        return cls(facts=facts, version=version)
@@ -1,15 +1,17 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from typing import Dict, List, Tuple, Any
 import os
 import re
+import threading
 
 from .config import RAGConfig
 from .extract import iter_pdf_pages
 from .chunking import TokenChunker
 from .embeddings import Embedder
-from .vector_store import FaissStore
+from .vector_store import FaissStore, current_index_version, resolve_index_dir, new_index_version, publish_index_version
+from .facts import FactTable, format_fact_answer
 from .rerank import Reranker
 from .llm_vllm import VLLMGenerator
 from .prompts import SYSTEM_PROMPT, build_user_prompt
@@ -46,6 +48,13 @@ def _evidence_matches(context_blocks: List[str], evidence: List[str]) -> bool:
             return False
     return True
 
+class IndexReloadError(RuntimeError):
+    """Loading an index version failed; `version` is the one that was attempted."""
+
+    def __init__(self, version: str | None):
+        super().__init__(f"failed to load index version {version!r}")
+        self.version = version
+
 @dataclass
 class RAGPipeline:
     config: RAGConfig
@@ -54,10 +63,13 @@ class RAGPipeline:
     reranker: Reranker
     llm: VLLMGenerator
     scope_gate: ScopeGate
+    facts: FactTable = field(default_factory=FactTable)
 
     @classmethod
     def from_index(cls, index_dir: Path, config: RAGConfig) -> "RAGPipeline":
-        store = FaissStore.load(index_dir)
+        version_dir, version = resolve_index_dir(index_dir)
+        store = FaissStore.load(version_dir, version=version)
+        facts = FactTable.load(version_dir, version=version)
         embedder = Embedder(config.embed_model, device=config.embed_device, batch_size=config.embed_batch_size, normalize=config.normalize_embeddings)
         reranker = Reranker(config.rerank_model, device=config.rerank_device, batch_size=config.rerank_batch_size)
         llm = VLLMGenerator(
@@ -66,12 +78,35 @@ class RAGPipeline:
             temperature=config.llm_temperature,
             top_p=config.llm_top_p,
         )
-        return cls(config=config, store=store, embedder=embedder, reranker=reranker, llm=llm, scope_gate=ScopeGate())
+        return cls(config=config, store=store, embedder=embedder, reranker=reranker, llm=llm, scope_gate=ScopeGate(), facts=facts)
+
+    def reload_index(self, index_dir: Path) -> bool:
+        """Loads the version CURRENT points at and swaps it in; models stay resident.
+
+        Returns False if that version is already being served (or the index predates
+        versioning, so there is nothing to flip to). Raises IndexReloadError carrying
+        the version it tried to load if that fails; the old version keeps serving.
+        """
+        # Read CURRENT once; store and facts must come from the same version directory.
+        version_dir, version = resolve_index_dir(index_dir)
+        if version == self.store.version and version == self.facts.version:
+            return False
+        # Rebinding the attribute is atomic: requests that already grabbed the old store
+        # finish on it, and it is freed once the last of them drops its reference.
+        try:
+            facts = FactTable.load(version_dir, version=version)
+            store = FaissStore.load(version_dir, version=version)
+        except Exception as e:
+            raise IndexReloadError(version) from e
+        self.facts = facts
+        self.store = store
+        return True
 
     def retrieve_top5(self, query: str) -> List[Tuple[Dict[str, Any], str, float]]:
+        store = self.store  # single snapshot so a concurrent hot-swap can't mix versions
         qvec = self.embedder.encode([query])[0]
-        hits = self.store.search(qvec, self.config.top_k)
-        metas_texts = [(self.store.metas[i], self.store.texts[i], score) for i, score in hits]
+        hits = store.search(qvec, self.config.top_k)
+        metas_texts = [(store.metas[i], store.texts[i], score) for i, score in hits]
         return metas_texts
 
     def rerank_top5(self, query: str, retrieved: List[Tuple[Dict[str, Any], str, float]]) -> List[Tuple[Dict[str, Any], str, float]]:
@@ -85,6 +120,13 @@ class RAGPipeline:
         if self.scope_gate.is_out_of_scope(query):
             return {"answer": OUT_OF_SCOPE_MSG, "sources": []}
 
+        # Direct lookups (revenue, shares outstanding, signing date, ...) come straight from
+        # the precomputed fact table; no embedding, reranking or generation.
+        if self.config.fact_lookup:
+            fact = self.facts.lookup(query)
+            if fact is not None:
+                return {"answer": format_fact_answer(fact), "sources": _format_source(asdict(fact))}
+
         retrieved = self.retrieve_top5(query)
         if not retrieved:
             return {"answer": NOT_SPECIFIED_MSG, "sources": []}
@@ -139,10 +181,20 @@ def build_index(data_dir: Path, index_dir: Path, config: RAGConfig) -> None:
     embs = embedder.encode(texts)
 
     store = FaissStore.build(embeddings=embs, texts=texts, metas=metas)
-    store.save(index_dir)
+    facts = FactTable.build(pages)
+
+    version, version_dir = new_index_version(index_dir)
+    store.save(version_dir)
+    facts.save(version_dir)
+    publish_index_version(index_dir, version, keep_versions=config.index_keep_versions)
 
 # Required interface (assignment)
 _PIPELINE_SINGLETON: RAGPipeline | None = None
+_PIPELINE_LOCK = threading.Lock()  # guards singleton construction (cold load of all models)
+_RELOAD_LOCK = threading.Lock()    # serializes index reloads; never held across a cold load
+
+def serving_index_dir() -> Path:
+    return Path(os.environ.get("RAG_INDEX_DIR", "index"))
 
 def answer_question(query: str) -> Dict[str, Any]:
     """Answers a question using the RAG pipeline.
@@ -154,8 +206,29 @@ def answer_question(query: str) -> Dict[str, Any]:
       }
     """
     global _PIPELINE_SINGLETON
-    index_dir = Path(os.environ.get("RAG_INDEX_DIR", "index"))
-    config = RAGConfig(llm_model=os.environ.get("RAG_LLM_MODEL", RAGConfig().llm_model))
     if _PIPELINE_SINGLETON is None:
-        _PIPELINE_SINGLETON = RAGPipeline.from_index(index_dir=index_dir, config=config)
+        with _PIPELINE_LOCK:
+            if _PIPELINE_SINGLETON is None:
+                config = RAGConfig(llm_model=os.environ.get("RAG_LLM_MODEL", RAGConfig().llm_model))
+                _PIPELINE_SINGLETON = RAGPipeline.from_index(index_dir=serving_index_dir(), config=config)
     return _PIPELINE_SINGLETON.answer(query)
+
+def reload_index(blocking: bool = True) -> Dict[str, Any] | None:
+    """Hot-swaps the serving index to the version CURRENT points at.
+
+    Returns {"status": ..., "version": ...} where status is "reloaded", "unchanged"
+    (that version is already live) or "not_loaded" (the pipeline is still cold; the
+    first request will load the current version). With blocking=False, returns None
+    instead of waiting when another reload is already running. Raises IndexReloadError
+    if the new version cannot be loaded.
+    """
+    if not _RELOAD_LOCK.acquire(blocking=blocking):
+        return None
+    try:
+        pipeline = _PIPELINE_SINGLETON
+        if pipeline is None:
+            return {"status": "not_loaded", "version": current_index_version(serving_index_dir())}
+        reloaded = pipeline.reload_index(serving_index_dir())
+        return {"status": "reloaded" if reloaded else "unchanged", "version": pipeline.store.version}
+    finally:
+        _RELOAD_LOCK.release()
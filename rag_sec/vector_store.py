@@ -2,16 +2,51 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
+from datetime import datetime, timezone
+import os
+import shutil
 import numpy as np
 import faiss
 import orjson
 
+# Versioned layout written by ingest:
+#   <index_dir>/versions/<version>/{faiss.index,store.jsonl,manifest.json,facts.jsonl}
+#   <index_dir>/CURRENT   -> name of the live version (flipped atomically)
+# A flat <index_dir>/faiss.index without CURRENT is still loadable (legacy layout).
+CURRENT_POINTER = "CURRENT"
+VERSIONS_DIR = "versions"
+
+def current_index_version(index_dir: Path) -> Optional[str]:
+    pointer = index_dir / CURRENT_POINTER
+    if not pointer.exists():
+        return None
+    version = pointer.read_text(encoding="utf-8").strip()
+    return version or None
+
+def new_index_version(index_dir: Path) -> Tuple[str, Path]:
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    return version, index_dir / VERSIONS_DIR / version
+
+def publish_index_version(index_dir: Path, version: str, keep_versions: int = 3) -> None:
+    # Flip CURRENT only after the version directory is fully written, so readers never see a half-written index.
+    tmp = index_dir / (CURRENT_POINTER + ".tmp")
+    tmp.write_text(version, encoding="utf-8")
+    os.replace(tmp, index_dir / CURRENT_POINTER)
+    _prune_versions(index_dir, keep_versions)
+
+def resolve_index_dir(index_dir: Path) -> Tuple[Path, Optional[str]]:
+    version = current_index_version(index_dir)
+    if version is None:
+        return index_dir, None
+    return index_dir / VERSIONS_DIR / version, version
+
 @dataclass
 class FaissStore:
     dim: int
     index: faiss.Index
     texts: List[str]
     metas: List[Dict]
+    version: Optional[str] = None
 
     @classmethod
     def build(cls, embeddings: np.ndarray, texts: List[str], metas: List[Dict]) -> "FaissStore":
@@ -44,7 +79,10 @@ class FaissStore:
         (out_dir / "manifest.json").write_bytes(orjson.dumps(meta, option=orjson.OPT_INDENT_2))
 
     @classmethod
-    def load(cls, out_dir: Path) -> "FaissStore":
+    def load(cls, out_dir: Path, version: Optional[str] = None) -> "FaissStore":
+        # Callers that already resolved CURRENT pass the version dir + version so one pointer read covers every file.
+        if version is None:
+            out_dir, version = resolve_index_dir(out_dir)
         idx = faiss.read_index(str(out_dir / "faiss.index"))
         texts = []
         metas = []
@@ -56,4 +94,13 @@ class FaissStore:
                 texts.append(obj["text"])
                 metas.append(obj["meta"])
         dim = idx.d
-        return cls(dim=dim, index=idx, texts=texts, metas=metas)
+        return cls(dim=dim, index=idx, texts=texts, metas=metas, version=version)
+
+def _prune_versions(index_dir: Path, keep_versions: int) -> None:
+    # Old versions are only needed on disk until a running API has swapped away from them;
+    # once loaded, a FaissStore lives entirely in memory.
+    live = current_index_version(index_dir)
+    versions = sorted(p for p in (index_dir / VERSIONS_DIR).iterdir() if p.is_dir())
+    for p in versions[:-max(1, keep_versions)]:
+        if p.name != live:
+            shutil.rmtree(p, ignore_errors=True)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import pytest
+from fastapi import HTTPException
+
+from rag_sec import api
+from rag_sec.pipeline import IndexReloadError
+
+class FakeStop:
+    """Lets _watch_index run a fixed number of polls without sleeping."""
+
+    def __init__(self, polls: int):
+        self.polls = polls
+
+    def wait(self, timeout):
+        self.polls -= 1
+        return self.polls < 0
+
+def _watch(monkeypatch, polls: int, current, reload_index, max_retries: int = 2) -> None:
+    monkeypatch.setattr(api, "current_index_version", lambda index_dir: current())
+    monkeypatch.setattr(api, "reload_index", reload_index)
+    api._watch_index(FakeStop(polls), interval=0, max_retries=max_retries)
+
+def test_watcher_gives_up_on_failed_version_until_current_changes(monkeypatch):
+    pointer = {"version": "v2"}
+    attempts = []
+
+    def reload_index():
+        attempts.append(pointer["version"])
+        if len(attempts) == 2:
+            pointer["version"] = "v3"  # the next ingest lands after v2 was given up on
+        raise IndexReloadError("v2" if len(attempts) <= 2 else "v3")
+
+    _watch(monkeypatch, polls=6, current=lambda: pointer["version"], reload_index=reload_index)
+    # v2 retried max_retries times, then v3 is attempted as soon as CURRENT points at it
+    assert attempts == ["v2", "v2", "v3", "v3"]
+
+def test_watcher_uses_version_from_reload_not_a_separate_pointer_read(monkeypatch):
+    attempts = []
+
+    def reload_index():
+        attempts.append(1)
+        raise IndexReloadError("v2")
+
+    # CURRENT already reads v3 when the watcher checks, but the failed load was of v2:
+    # v3 must not be recorded as failed and skipped.
+    _watch(monkeypatch, polls=4, current=lambda: "v3", reload_index=reload_index)
+    assert len(attempts) == 4
+
+def test_watcher_retries_transient_failure(monkeypatch):
+    results = iter([IndexReloadError("v2"), {"status": "reloaded", "version": "v2"}])
+    calls = []
+
+    def reload_index():
+        calls.append(1)
+        r = next(results, {"status": "unchanged", "version": "v2"})
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    _watch(monkeypatch, polls=3, current=lambda: "v2", reload_index=reload_index)
+    assert len(calls) == 3
+
+def test_admin_reload_disabled_without_token(monkeypatch):
+    monkeypatch.delenv("RAG_ADMIN_TOKEN", raising=False)
+    with pytest.raises(HTTPException) as exc:
+        api.admin_reload(x_admin_token="anything")
+    assert exc.value.status_code == 404
+
+def test_admin_reload_rejects_wrong_token(monkeypatch):
+    monkeypatch.setenv("RAG_ADMIN_TOKEN", "secret")
+    for token in [None, "wrong"]:
+        with pytest.raises(HTTPException) as exc:
+            api.admin_reload(x_admin_token=token)
+        assert exc.value.status_code == 403
+
+def test_admin_reload_conflict_and_success(monkeypatch):
+    monkeypatch.setenv("RAG_ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(api, "reload_index", lambda blocking: None)
+    with pytest.raises(HTTPException) as exc:
+        api.admin_reload(x_admin_token="secret")
+    assert exc.value.status_code == 409
+
+    monkeypatch.setattr(api, "reload_index", lambda blocking: {"status": "reloaded", "version": "v2"})
+    assert api.admin_reload(x_admin_token="secret") == {"status": "reloaded", "version": "v2"}
+
+def test_admin_reload_reports_failed_version(monkeypatch):
+    monkeypatch.setenv("RAG_ADMIN_TOKEN", "secret")
+
+    def reload_index(blocking):
+        raise IndexReloadError("v2")
+
+    monkeypatch.setattr(api, "reload_index", reload_index)
+    with pytest.raises(HTTPException) as exc:
+        api.admin_reload(x_admin_token="secret")
+    assert exc.value.status_code == 500 and "v2" in exc.value.detail
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from pathlib import Path
+
+from rag_sec import extract
+from rag_sec.extract import ROW_Y_TOLERANCE, _page_rows, iter_pdf_page_rows
+
+class FakePage:
+    def __init__(self, words):
+        self.words = words
+
+    def get_text(self, kind):
+        assert kind == "words"
+        return self.words
+
+class FakeDoc:
+    def __init__(self, pages):
+        self.pages = pages
+        self.page_count = len(pages)
+
+    def load_page(self, i):
+        return self.pages[i]
+
+def _word(x0: float, y_mid: float, text: str):
+    # (x0, y0, x1, y1, word, block_no, line_no, word_no), boxes 8pt tall
+    return (x0, y_mid - 4, x0 + 5 * len(text), y_mid + 4, text, 0, 0, 0)
+
+def test_page_rows_groups_by_y_and_orders_left_to_right():
+    jitter = ROW_Y_TOLERANCE / 2
+    words = [
+        # label and cells of one row come from different text blocks at slightly different baselines
+        _word(420, 100 + jitter, "383,285"),
+        _word(10, 100, "Total"),
+        _word(300, 100 - jitter, "391,035"),
+        _word(45, 100, "net"),
+        _word(65, 100, "sales"),
+        # next row starts beyond the tolerance
+        _word(10, 100 + 3 * ROW_Y_TOLERANCE, "Net"),
+        _word(30, 100 + 3 * ROW_Y_TOLERANCE, "income"),
+        _word(300, 100 + 3 * ROW_Y_TOLERANCE, "93,736"),
+    ]
+    assert _page_rows(FakePage(words)) == ["Total net sales 391,035 383,285", "Net income 93,736"]
+
+def test_iter_pdf_page_rows_skips_empty_pages(monkeypatch):
+    doc = FakeDoc([FakePage([]), FakePage([_word(10, 50, "Item"), _word(40, 50, "8.")])])
+    monkeypatch.setattr(extract.fitz, "open", lambda path: doc)
+    assert list(iter_pdf_page_rows(Path("x.pdf"))) == [(2, ["Item 8."])]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+import pytest
+
+from rag_sec.extract import PageDoc
+from rag_sec.facts import (
+    FactTable,
+    _cover_facts,
+    _header_periods,
+    _split_row,
+    _table_facts,
+    format_fact_answer,
+)
+
+def _page(company: str, page_pdf: int, text: str = "", item: str | None = "Item 8") -> PageDoc:
+    doc_name = f"{company} 10-K"
+    return PageDoc(doc_name, company, f"{company.lower()}.pdf", page_pdf, page_pdf + 10, item, None, text)
+
+# Rows as rebuilt by extract._page_rows from the statement pages of the two filings.
+APPLE_INCOME = [
+    "CONSOLIDATED STATEMENTS OF OPERATIONS",
+    "(In millions, except number of shares, which are reflected in thousands, and per-share amounts)",
+    "Years ended",
+    "September 28, 2024 September 30, 2023 September 24, 2022",
+    "Net sales:",
+    "Products $ 294,866 $ 298,085 $ 316,199",
+    "Services 96,169 85,200 78,129",
+    "Total net sales 391,035 383,285 394,328",
+    "Net income $ 93,736 $ 96,995 $ 99,803",
+    "Earnings per share:",
+    "Diluted $ 6.08 $ 6.13 $ 6.11",
+    "Shares used in computing earnings per share:",
+    "Diluted 15,408,095 15,812,547 16,325,819",
+]
+APPLE_BALANCE = [
+    "CONSOLIDATED BALANCE SHEETS",
+    "(In millions, except number of shares, which are reflected in thousands, and par value)",
+    "September 28, 2024 September 30, 2023",
+    "Current liabilities:",
+    "Term debt 10,912 9,822",
+    "Total current liabilities 176,392 145,308",
+    "Non-current liabilities:",
+    "Term debt 85,750 95,281",
+    "Total liabilities 308,030 290,437",
+    "Total liabilities and shareholders’ equity $ 364,980 $ 352,583",
+]
+# Note 9 – Term Debt: fiscal-year column groups, each an amount plus an effective-interest-rate column.
+APPLE_TERM_DEBT = [
+    "Term Debt",
+    "Maturities 2024 2023",
+    "(calendar year) Amount (in millions) Effective Interest Rate Amount (in millions) Effective Interest Rate",
+    "2013 – 2023 debt issuances:",
+    "Fixed-rate 0.000% – 4.850% notes 2024 – 2062 $ 97,341 0.03% – 6.72% $ 106,572 0.03% – 6.72%",
+    "Total term debt principal 97,341 106,572",
+    "Unamortized premium/(discount) and issuance costs, net (321) (356)",
+    "Hedge accounting fair value adjustments (358) (1,113)",
+    "Total term debt 96,662 105,103",
+    "Less: Current portion of term debt (10,912) (9,822)",
+    "Total non-current portion of term debt $ 85,750 $ 95,281",
+]
+TESLA_INCOME = [
+    "Consolidated Statements of Operations",
+    "(in millions, except per share data)",
+    "Year Ended December 31,",
+    "2023 2022 2021",
+    "Revenues",
+    "Automotive sales $ 78,509 $ 67,210 $ 44,125",
+    "Total revenues 96,773 81,462 53,823",
+    "Net income 15,001 12,587 5,644",
+    "Net income attributable to common stockholders $ 14,997 $ 12,556 $ 5,519",
+]
+
+@pytest.fixture(scope="module")
+def table() -> FactTable:
+    facts = []
+    facts += _table_facts(_page("Apple", 30), APPLE_INCOME)
+    facts += _table_facts(_page("Apple", 32), APPLE_BALANCE)
+    facts += _table_facts(_page("Apple", 48), APPLE_TERM_DEBT)
+    facts += _table_facts(_page("Tesla", 52), TESLA_INCOME)
+    facts += _cover_facts(_page("Apple", 1, "15,115,823,000 shares of common stock were issued and\noutstanding as of October 18, 2024.", item=None))
+    facts += _cover_facts(_page("Tesla", 1, "As of January 29, 2024, there were 3,185,000,000 shares of the registrant’s common stock outstanding.", item=None))
+    facts += _cover_facts(_page("Apple", 60, "SIGNATURES\nPursuant to the requirements of Section 13 or 15(d) of the Securities Exchange Act\nDate: November 1, 2024", item="Item 16"))
+    return FactTable(facts=list(facts))
+
+def _answer(table: FactTable, query: str) -> str | None:
+    fact = table.lookup(query)
+    return format_fact_answer(fact) if fact is not None else None
+
+def test_split_row_strips_currency_and_keeps_negatives():
+    assert _split_row("Net income $ 93,736 $ (1,234) —") == ("Net income", ["93,736", "(1,234)", "—"])
+    assert _split_row("Net sales:") == ("Net sales:", [])
+
+def test_header_periods():
+    assert _header_periods("September 28, 2024 September 30, 2023") == ["September 28, 2024", "September 30, 2023"]
+    assert _header_periods("2023 2022 2021") == ["2023", "2022", "2021"]
+    assert _header_periods("Maturities 2024 2023") == ["2024", "2023"]
+    assert _header_periods("Total net sales 391,035 383,285") is None
+    assert _header_periods("Fiscal 2024") is None
+    assert _header_periods("2013 – 2023 debt issuances:") is None
+
+def test_table_rows_carry_section_and_units(table: FactTable):
+    shares = table.by_metric["shares used in computing earnings per share diluted"][0]
+    assert shares.unit == "shares thousands"
+    assert table.by_metric["earnings per share diluted"][0].unit == "USD"
+    assert "current liabilities term debt" in table.by_metric
+    assert "non current liabilities term debt" in table.by_metric
+
+def test_term_debt_note_skips_rate_columns(table: FactTable):
+    by_period = {f.period: f.value_text for f in table.by_metric["total term debt"]}
+    assert by_period == {"2024": "96,662", "2023": "105,103"}
+    assert table.by_metric["less current portion of term debt"][0].value == -10912.0
+    assert not any("notes" in m for m in table.by_metric)
+
+def test_table_facts_without_item_are_not_cover_page():
+    facts = list(_table_facts(_page("Apple", 30, item=None), APPLE_INCOME))
+    assert facts and {f.item for f in facts} == {"Unknown"}
+
+def test_format_fact_answer(table: FactTable):
+    fact = table.by_metric["total net sales"][0]
+    assert format_fact_answer(fact) == "Total net sales (September 28, 2024): $391,035 million"
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("What were Apple's total net sales for the fiscal year ended September 28, 2024?",
+         "Total net sales (September 28, 2024): $391,035 million"),
+        ("Apple total revenue 2023", "Total net sales (September 30, 2023): $383,285 million"),
+        ("What was Tesla's total revenue in 2022?", "Total revenues (2022): $81,462 million"),
+        ("What was Tesla's net income for the year ended December 31, 2023?", "Net income (2023): $15,001 million"),
+        ("What was Apple's net income?", "Net income (September 28, 2024): $93,736 million"),
+        ("What were Apple's total liabilities as of September 30, 2023?", "Total liabilities (September 30, 2023): $290,437 million"),
+        ("What was Apple's total term debt in fiscal 2024?", "Total term debt (2024): $96,662 million"),
+        ("How many shares of common stock were outstanding as of January 29, 2024?",
+         "Shares of common stock outstanding (January 29, 2024): 3,185,000,000 shares"),
+        ("How many Apple shares were issued and outstanding as of October 18, 2024?",
+         "Shares of common stock outstanding (October 18, 2024): 15,115,823,000 shares"),
+        ("When was Apple's annual report signed?", "Signing date: November 1, 2024"),
+        ("On what date was the Apple 10-K signed and filed with the SEC?", "Signing date: November 1, 2024"),
+    ],
+)
+def test_direct_lookups_answered_from_table(table: FactTable, query: str, expected: str):
+    assert _answer(table, query) == expected
+
+def test_lookup_citation_fields(table: FactTable):
+    fact = table.lookup("What was Apple's total revenue in 2024?")
+    assert (fact.doc_name, fact.item, fact.page_report) == ("Apple 10-K", "Item 8", 40)
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        # comparisons / no company named while both filings have the metric
+        "Was Apple's net income higher than Tesla's?",
+        "What was net income?",
+        "What was total revenue in 2023?",
+        "What was net income for Apple and Tesla in 2023?",
+        # more specific or derived than the matched line item
+        "What was Apple's net income per share in 2024?",
+        "What was Tesla's net income attributable to common stockholders in 2023?",
+        "How many weighted-average diluted shares were outstanding for Apple in 2024?",
+        "What were Apple's total liabilities and shareholders' equity as of September 28, 2024?",
+        "What was the current portion of Apple's term debt as of September 28, 2024?",
+        "What were Apple's total net sales in Greater China in 2024?",
+        "What were Apple's total net sales of iPhone in 2024?",
+        "What were Tesla's total revenues from energy generation and storage in 2023?",
+        "What was Tesla's net income in Q4 2023?",
+        "What was Tesla's net income margin for 2023?",
+        "What was the net income of Apple's Services segment in 2024?",
+        "What % of Tesla's total revenues in 2023 was net income?",
+        "Why did Apple's net income fall in 2024?",
+        # not a date question
+        "Who signed Apple's 10-K?",
+        "Was Apple's 10-K signed?",
+    ],
+)
+def test_ambiguous_or_specific_questions_fall_back(table: FactTable, query: str):
+    assert table.lookup(query) is None
@@ -0,0 +1,104 @@
+from __future__ import annotations
+from pathlib import Path
+import numpy as np
+import pytest
+
+from rag_sec import pipeline
+from rag_sec.config import RAGConfig
+from rag_sec.facts import Fact, FactTable
+from rag_sec.guards import ScopeGate
+from rag_sec.pipeline import IndexReloadError, RAGPipeline
+from rag_sec.vector_store import (
+    VERSIONS_DIR,
+    FaissStore,
+    current_index_version,
+    new_index_version,
+    publish_index_version,
+    resolve_index_dir,
+)
+
+def _store(text: str) -> FaissStore:
+    return FaissStore.build(embeddings=np.eye(2, dtype=np.float32), texts=[text, text + "-2"], metas=[{}, {}])
+
+def _facts(value: str) -> FactTable:
+    fact = Fact("net income", "Net income", "2024", None, value, "USD millions", "Apple", "Apple 10-K", "Item 8", 30, 40)
+    return FactTable(facts=[fact])
+
+def _publish(index_dir: Path, version: str, text: str, keep_versions: int = 3) -> None:
+    version_dir = index_dir / VERSIONS_DIR / version
+    _store(text).save(version_dir)
+    _facts(text).save(version_dir)
+    publish_index_version(index_dir, version, keep_versions=keep_versions)
+
+def _pipeline(index_dir: Path) -> RAGPipeline:
+    # Models are irrelevant to index swaps; only the store and fact table are touched.
+    return RAGPipeline(
+        config=RAGConfig(), store=FaissStore.load(index_dir), embedder=None, reranker=None, llm=None,
+        scope_gate=ScopeGate(), facts=FactTable.load(index_dir),
+    )
+
+def test_resolve_index_dir_legacy_flat_layout(tmp_path: Path):
+    _store("old").save(tmp_path)
+    assert resolve_index_dir(tmp_path) == (tmp_path, None)
+    store = FaissStore.load(tmp_path)
+    assert store.version is None and store.texts[0] == "old"
+
+def test_publish_flips_current(tmp_path: Path):
+    version, version_dir = new_index_version(tmp_path)
+    _store("new").save(version_dir)
+    publish_index_version(tmp_path, version)
+    assert current_index_version(tmp_path) == version
+    assert resolve_index_dir(tmp_path) == (version_dir, version)
+    assert FaissStore.load(tmp_path).version == version
+    assert not (tmp_path / "CURRENT.tmp").exists()
+
+def test_prune_keeps_newest_and_never_the_live_version(tmp_path: Path):
+    for v in ["v1", "v2", "v3", "v4"]:
+        _store(v).save(tmp_path / VERSIONS_DIR / v)
+    publish_index_version(tmp_path, "v1", keep_versions=2)
+    assert sorted(p.name for p in (tmp_path / VERSIONS_DIR).iterdir()) == ["v1", "v3", "v4"]
+
+def test_reload_is_noop_for_unchanged_version(tmp_path: Path):
+    _publish(tmp_path, "v1", "one")
+    pipe = _pipeline(tmp_path)
+    store = pipe.store
+    assert pipe.reload_index(tmp_path) is False
+    assert pipe.store is store
+
+def test_reload_swaps_store_and_facts_together(tmp_path: Path):
+    _publish(tmp_path, "v1", "one")
+    pipe = _pipeline(tmp_path)
+    in_flight = pipe.store
+    _publish(tmp_path, "v2", "two")
+    assert pipe.reload_index(tmp_path) is True
+    assert pipe.store.version == pipe.facts.version == "v2"
+    assert pipe.store.texts[0] == "two" and pipe.facts.facts[0].value_text == "two"
+    # a request that grabbed the old store keeps a consistent view of it
+    assert in_flight.version == "v1" and in_flight.texts[0] == "one"
+
+def test_reload_failure_reports_attempted_version_and_keeps_serving(tmp_path: Path):
+    _publish(tmp_path, "v1", "one")
+    pipe = _pipeline(tmp_path)
+    (tmp_path / VERSIONS_DIR / "v2").mkdir()
+    publish_index_version(tmp_path, "v2")  # pointer flipped to a version with no files
+    with pytest.raises(IndexReloadError) as exc:
+        pipe.reload_index(tmp_path)
+    assert exc.value.version == "v2"
+    assert pipe.store.version == pipe.facts.version == "v1"
+
+def test_module_reload_not_blocked_by_cold_load(tmp_path: Path, monkeypatch):
+    _publish(tmp_path, "v1", "one")
+    monkeypatch.setenv("RAG_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline, "_PIPELINE_SINGLETON", None)
+    with pipeline._PIPELINE_LOCK:  # a first request is busy loading the models
+        assert pipeline.reload_index(blocking=False) == {"status": "not_loaded", "version": "v1"}
+    with pipeline._RELOAD_LOCK:
+        assert pipeline.reload_index(blocking=False) is None
+
+def test_module_reload_statuses(tmp_path: Path, monkeypatch):
+    _publish(tmp_path, "v1", "one")
+    monkeypatch.setenv("RAG_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline, "_PIPELINE_SINGLETON", _pipeline(tmp_path))
+    assert pipeline.reload_index() == {"status": "unchanged", "version": "v1"}
+    _publish(tmp_path, "v2", "two")
+    assert pipeline.reload_index() == {"status": "reloaded", "version": "v2"}